@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
 import asyncio
-from datetime import datetime
+import time
+from collections.abc import Callable
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
@@ -11,54 +12,100 @@ import mcp.server.stdio
 server = Server("simple-mcp-server")
 
 
+# Tool definitions are static, so build them once instead of on every tools/list
+_TOOLS = [
+    types.Tool(
+        name="echo",
+        description="Echo back the input text",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "Text to echo back",
+                }
+            },
+            "required": ["text"],
+        },
+    ),
+    types.Tool(
+        name="current_time",
+        description="Get the current date and time",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    types.Tool(
+        name="add_numbers",
+        description="Add two numbers together",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "a": {
+                    "type": "number",
+                    "description": "First number",
+                },
+                "b": {
+                    "type": "number",
+                    "description": "Second number",
+                },
+            },
+            "required": ["a", "b"],
+        },
+    ),
+]
+
+
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
     """
     List available tools.
     Each tool specifies its arguments using JSON Schema validation.
     """
-    return [
-        types.Tool(
-            name="echo",
-            description="Echo back the input text",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "Text to echo back",
-                    }
-                },
-                "required": ["text"],
-            },
-        ),
-        types.Tool(
-            name="current_time",
-            description="Get the current date and time",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-        types.Tool(
-            name="add_numbers",
-            description="Add two numbers together",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {
-                        "type": "number",
-                        "description": "First number",
-                    },
-                    "b": {
-                        "type": "number",
-                        "description": "Second number",
-                    },
-                },
-                "required": ["a", "b"],
-            },
-        ),
-    ]
+    return _TOOLS
+
+
+def _echo(arguments: dict | None) -> list[types.TextContent]:
+    text = arguments.get("text", "") if arguments else ""
+    return [types.TextContent(type="text", text=f"Echo: {text}")]
+
+
+# Last formatted timestamp, reused while requests land within the same second
+_last_ts = 0
+_last_str = ""
+
+
+def _current_time(arguments: dict | None) -> list[types.TextContent]:
+    global _last_ts, _last_str
+    now = int(time.time())
+    if now != _last_ts:
+        _last_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _last_ts = now
+    current_time = _last_str
+    return [types.TextContent(type="text", text=f"Current time: {current_time}")]
+
+
+def _add_numbers(arguments: dict | None) -> list[types.TextContent]:
+    if not arguments:
+        raise ValueError("Arguments required for add_numbers")
+
+    a = arguments.get("a")
+    b = arguments.get("b")
+
+    if a is None or b is None:
+        raise ValueError("Both 'a' and 'b' parameters are required")
+
+    result = a + b
+    return [types.TextContent(type="text", text=f"Result: {a} + {b} = {result}")]
+
+
+# Tool name -> handler, so dispatch is a single dict lookup per call
+_HANDLERS: dict[str, Callable[[dict | None], list[types.TextContent]]] = {
+    "echo": _echo,
+    "current_time": _current_time,
+    "add_numbers": _add_numbers,
+}
 
 
 @server.call_tool()
@@ -68,30 +115,12 @@ async def handle_call_tool(
     """
     Handle tool execution requests.
     """
-    if name == "echo":
-        text = arguments.get("text", "") if arguments else ""
-        return [types.TextContent(type="text", text=f"Echo: {text}")]
-
-    elif name == "current_time":
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return [types.TextContent(type="text", text=f"Current time: {current_time}")]
-
-    elif name == "add_numbers":
-        if not arguments:
-            raise ValueError("Arguments required for add_numbers")
-
-        a = arguments.get("a")
-        b = arguments.get("b")
-
-        if a is None or b is None:
-            raise ValueError("Both 'a' and 'b' parameters are required")
-
-        result = a + b
-        return [types.TextContent(type="text", text=f"Result: {a} + {b} = {result}")]
-
-    else:
+    handler = _HANDLERS.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
 
+    return handler(arguments)
+
 
 async def main():
     # Run the server using stdin/stdout streams
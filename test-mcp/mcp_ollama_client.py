@@ -8,19 +8,36 @@ It works as follows:
 3. Dynamically generates a detailed prompt for a large language model (LLM),
    describing the tools.
 4. For each user input, it asks the LLM to choose the best tool and its arguments.
-5. Executes the chosen tool on the MCP server and prints the result.
+   Inputs are processed concurrently over the same MCP session.
+5. Executes the chosen tool on the MCP server and prints each result as it arrives.
 """
 
 import asyncio
-from typing import List, Dict, Any, Union
+import functools
+from contextlib import AsyncExitStack, aclosing
+from typing import List, Dict, Any, Optional, Tuple, Union
+import httpx
 from pydantic import BaseModel
-from langchain_ollama import ChatOllama
+from ollama import AsyncClient
 from mcp import ClientSession, ListToolsResult, Tool
+from mcp.types import CallToolResult, TextContent
 from mcp.client.streamable_http import streamablehttp_client
 
 # --- Configuration ---
 MCP_SERVER_URL = "http://127.0.0.1:8000/mcp"
 LLM_MODEL = "llama3.1:latest"
+MAX_INFLIGHT = 4  # Max user requests processed concurrently
+SELECTION_CACHE_SIZE = 1024  # Max LLM tool selections remembered
+# Stream the LLM reply and stop as soon as the JSON object closes. Set to
+# False for providers that can't cancel a generation mid-stream.
+STREAM_TOOL_SELECTION = True
+# Idle MCP connections stay open this long (httpx defaults to 5s), so a tool
+# call made after a slow LLM step reuses the connection. Keep it below the
+# server's keep-alive timeout.
+HTTP_KEEPALIVE_SECONDS = 60
+# Keep the model loaded between requests so Ollama can reuse the KV cache of
+# the unchanged tool-prompt prefix instead of re-evaluating it every time.
+LLM_KEEP_ALIVE = "30m"
 
 # --- LLM and Pydantic Model Setup ---
 
@@ -31,52 +48,271 @@ class ToolSelection(BaseModel):
     arguments: Dict[str, Any]
 
 
-# Initialize the LLM, configured to always output valid JSON
-# matching the ToolSelection schema.
-llm = ChatOllama(model=LLM_MODEL, temperature=0, format="json")
-structured_llm = llm.with_structured_output(ToolSelection)
+# Talk to Ollama directly. The ToolSelection JSON schema is generated once and
+# sent as Ollama's format, so replies are constrained to it and can be parsed
+# straight into ToolSelection with model_validate_json.
+ollama_client = AsyncClient()
+TOOL_SELECTION_SCHEMA = ToolSelection.model_json_schema()
+LLM_OPTIONS = {"temperature": 0}
+
+
+def _chat(tool_prompt: str, user_input: str, stream: bool):
+    # The static tool prompt always comes first as the system message, so
+    # requests only differ in the trailing user message and share a prefix.
+    return ollama_client.chat(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": tool_prompt},
+            {"role": "user", "content": f'User Input: "{user_input}"'},
+        ],
+        format=TOOL_SELECTION_SCHEMA,
+        options=LLM_OPTIONS,
+        keep_alive=LLM_KEEP_ALIVE,
+        stream=stream,
+    )
+
+
+class _JsonObjectScanner:
+    """Tracks brace depth across streamed chunks to find where the top-level
+    JSON object ends, ignoring braces inside string literals."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> int:
+        """Returns the index just past the closing brace in chunk, or -1."""
+        for i, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+async def _stream_tool_selection(tool_prompt: str, user_input: str) -> ToolSelection:
+    """Streams the LLM reply and cancels generation once the JSON object is
+    complete, so trailing tokens (often whitespace in JSON mode) aren't waited on."""
+    scanner = _JsonObjectScanner()
+    parts: List[str] = []
+    # aclosing makes the break close the HTTP stream, which stops Ollama
+    async with aclosing(await _chat(tool_prompt, user_input, stream=True)) as stream:
+        async for chunk in stream:
+            text = chunk.message.content or ""
+            end = scanner.feed(text)
+            if end != -1:
+                parts.append(text[:end])
+                break
+            parts.append(text)
+    return ToolSelection.model_validate_json("".join(parts))
+
+
+# LLM answers keyed by (tool prompt, user input). The LLM runs at temperature
+# 0, so a repeated input can skip the Ollama round-trip entirely. Entries are
+# tasks, so concurrent duplicates also share the one call that is in flight.
+_selection_cache: Dict[Tuple[str, str], "asyncio.Task[ToolSelection]"] = {}
+
+
+async def _select_tool(tool_prompt: str, user_input: str) -> ToolSelection:
+    if STREAM_TOOL_SELECTION:
+        return await _stream_tool_selection(tool_prompt, user_input)
+    response = await _chat(tool_prompt, user_input, stream=False)
+    return ToolSelection.model_validate_json(response.message.content)
+
+
+def _forget_failed_selection(
+    key: Tuple[str, str], task: "asyncio.Task[ToolSelection]"
+) -> None:
+    # Failed or cancelled selections are retried by the next request
+    if task.cancelled() or task.exception() is not None:
+        if _selection_cache.get(key) is task:
+            del _selection_cache[key]
+
+
+async def choose_tool(tool_prompt: str, user_input: str) -> ToolSelection:
+    """Asks the LLM to choose a tool, reusing the answer for repeated prompts."""
+    key = (tool_prompt, user_input)
+    task = _selection_cache.get(key)
+    if task is None:
+        if len(_selection_cache) >= SELECTION_CACHE_SIZE:
+            # Dicts keep insertion order, so this drops the oldest entry
+            _selection_cache.pop(next(iter(_selection_cache)))
+        task = asyncio.create_task(_select_tool(tool_prompt, user_input))
+        task.add_done_callback(functools.partial(_forget_failed_selection, key))
+        _selection_cache[key] = task
+    # Shielded so one caller being cancelled doesn't cancel the shared call
+    return await asyncio.shield(task)
+
+
+# Same as the MCP SDK's default httpx client, plus a longer keep-alive
+def _keepalive_http_client(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout if timeout is not None else httpx.Timeout(30.0),
+        headers=headers,
+        auth=auth,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+        ),
+    )
+
+
+# Keeps a single MCP session open so every tool call reuses the same
+# connection and initialize handshake.
+class McpClient:
+    def __init__(self, url: str):
+        self.url = url
+        self.session: Optional[ClientSession] = None
+        self._stack = AsyncExitStack()
+        # Tool names from this session's last tools/list, used by has_tool
+        self._tool_names: Optional[frozenset] = None
+
+    async def __aenter__(self) -> "McpClient":
+        try:
+            read, write, _ = await self._stack.enter_async_context(
+                streamablehttp_client(
+                    self.url, httpx_client_factory=_keepalive_http_client
+                )
+            )
+            self.session = await self._stack.enter_async_context(
+                ClientSession(read, write)
+            )
+            await self.session.initialize()
+        except BaseException:
+            await self._stack.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._stack.aclose()
+        self.session = None
+        self._tool_names = None
+
+    def _require_session(self) -> ClientSession:
+        if self.session is None:
+            raise RuntimeError("McpClient is not connected; use it with 'async with'")
+        return self.session
+
+    async def list_tools(self) -> ListToolsResult:
+        tool_list = await self._require_session().list_tools()
+        self._tool_names = frozenset(tool.name for tool in tool_list.tools)
+        return tool_list
+
+    async def has_tool(self, name: str) -> bool:
+        if self._tool_names is None:
+            await self.list_tools()  # Fetched once per session
+        return name in self._tool_names
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        return await self._require_session().call_tool(name, arguments)
+
+
+TOOL_PROMPT_HEADER = (
+    "You are an expert tool selector. Based on the user's input, "
+    "choose the single most appropriate tool and provide the necessary arguments."
+    "\n\nHere are the available tools:"
+)
 
 
 # Returns a prompt with the name of tools and it's available arguments
 def create_tool_prompt(tool_list: ListToolsResult) -> str:
     """Generates a system prompt for the LLM describing available tools."""
-    prompt = (
-        "You are an expert tool selector. Based on the user's input, "
-        "choose the single most appropriate tool and provide the necessary arguments."
-        "\n\nHere are the available tools:"
+    return _render_tool_prompt(
+        tuple((tool.name, tool.description) for tool in tool_list.tools)
     )
 
-    for tool in tool_list.tools:
-        prompt += f"- {tool.name}: {tool.description}\n"
 
-    return prompt
+@functools.cache
+def _render_tool_prompt(tools: Tuple[Tuple[str, Optional[str]], ...]) -> str:
+    """Memoized on the (name, description) pairs, so an unchanged tool list is free."""
+    prompt_lines = [TOOL_PROMPT_HEADER]
+    prompt_lines.extend(f"- {name}: {description}" for name, description in tools)
+    return "\n".join(prompt_lines)
+
+
+def extract_text(content: List[Any]) -> List[str]:
+    """Returns the text of every TextContent block in a tool result."""
+    # Tool results are usually a single block
+    if len(content) == 1:
+        block = content[0]
+        return [block.text] if type(block) is TextContent else []
+    return [block.text for block in content if type(block) is TextContent]
 
 
 async def process_user_request(
-    session: ClientSession, user_input: str, tool_prompt: str
-) -> None:
+    client: McpClient, user_input: str, tool_prompt: str
+) -> str:
     """
-    Selects a tool using an LLM, executes it, and prints the result.
+    Selects a tool using an LLM, executes it, and returns the printable result.
 
     Args:
-        session: An active MCP ClientSession.
+        client: An open McpClient.
         user_input: The user's natural language input.
         tool_prompt: The pre-generated prompt describing available tools.
     """
-    # 1. Ask the LLM to choose a tool
-    full_prompt = f'{tool_prompt}\n\n---\nUser Input: "{user_input}"'
-    tool_selection = structured_llm.invoke(full_prompt)
+    # 1. Ask the LLM to choose a tool (awaited so other requests keep running)
+    tool_selection = await choose_tool(tool_prompt, user_input)
 
-    print(f"LLM Chose -> Tool: {tool_selection.name}, Args: {tool_selection.arguments}")
+    lines = [
+        f"LLM Chose -> Tool: {tool_selection.name}, Args: {tool_selection.arguments}"
+    ]
 
-    # 2. Execute the chosen tool on the server
-    result = await session.call_tool(tool_selection.name, tool_selection.arguments)
+    # 2. Execute the chosen tool on the server, skipping the round-trip
+    # when the LLM made up a tool name
+    if not await client.has_tool(tool_selection.name):
+        lines.append(f"Unknown tool, not sent to the server: {tool_selection.name}")
+        return "\n".join(lines)
+    result = await client.call_tool(tool_selection.name, tool_selection.arguments)
 
-    # 3. Print the result from the server
-    text_blocks = [block.text for block in result.content if hasattr(block, "text")]
-    print("Server Response:")
-    for text in text_blocks:
-        print(f"- {text}")
+    # 3. Collect the result from the server
+    lines.append("Server Response:")
+    lines.extend(f"- {text}" for text in extract_text(result.content))
+    return "\n".join(lines)
+
+
+async def process_user_requests(
+    client: McpClient, user_inputs: List[str], tool_prompt: str
+) -> None:
+    """
+    Runs every user request concurrently and prints each result as it finishes.
+
+    Args:
+        client: An open McpClient shared by all requests.
+        user_inputs: The user's natural language inputs.
+        tool_prompt: The pre-generated prompt describing available tools.
+    """
+    semaphore = asyncio.Semaphore(MAX_INFLIGHT)
+
+    async def run_one(user_input: str) -> str:
+        # A failure is reported as that input's result, so the other requests
+        # still finish before the shared session is closed
+        async with semaphore:
+            try:
+                return await process_user_request(client, user_input, tool_prompt)
+            except Exception as e:
+                return f"Request failed for {user_input!r}: {e}"
+
+    for finished in asyncio.as_completed([run_one(u) for u in user_inputs]):
+        print(await finished)
+        print("-" * 50)
 
 
 async def main():
@@ -89,23 +325,18 @@ async def main():
 
     print(f"Connecting to MCP server at {MCP_SERVER_URL}...")
     try:
-        async with streamablehttp_client(MCP_SERVER_URL) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-
-                tool_list = await session.list_tools()
+        async with McpClient(MCP_SERVER_URL) as client:
+            tool_list = await client.list_tools()
 
-                # Generate the master tool prompt once
-                dynamic_tool_prompt = create_tool_prompt(tool_list)
+            # Generate the master tool prompt once
+            dynamic_tool_prompt = create_tool_prompt(tool_list)
 
-                print("\n--- LLM Tool Prompt ---")
-                print(dynamic_tool_prompt)
-                print("-----------------------\n")
+            print("\n--- LLM Tool Prompt ---")
+            print(dynamic_tool_prompt)
+            print("-----------------------\n")
 
-                # Process each user request
-                for user_input in user_inputs:
-                    await process_user_request(session, user_input, dynamic_tool_prompt)
-                    print("-" * 50)
+            # Process the user requests concurrently over the same session
+            await process_user_requests(client, user_inputs, dynamic_tool_prompt)
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
@@ -4,30 +4,74 @@ Run the FastMCP server from index.py over Streamable HTTP on /mcp.
 Usage:
   uv run python test-mcp/server_http.py
 Then connect a client to http://127.0.0.1:8000/mcp
+Set JSON_RESPONSE = False to receive in-call progress/log notifications.
 """
 
 import asyncio
+from contextlib import asynccontextmanager
 from uvicorn import run as uvicorn_run
 from typing import Optional
 import aiosqlite
+from pydantic import BaseModel
+from starlette.applications import Starlette
+from starlette.routing import Mount
 from mcp.server.fastmcp import FastMCP
 
+# Answer tool calls with plain JSON instead of a one-event SSE stream, so the
+# response is read in full and its connection goes back to the client's
+# keep-alive pool. Without SSE, in-call progress and log notifications are lost.
+JSON_RESPONSE = True
+
 # Create an MCP server
-mcp = FastMCP("BlogMCP")
+mcp = FastMCP("BlogMCP", json_response=JSON_RESPONSE)
 DB_FILE = "test-mcp/content.db"
+INSERT_POST = "INSERT INTO posts (title, content) VALUES (?, ?)"
+# Reads take a LIMIT parameter (-1 means no limit in SQLite), so this is one
+# fixed statement that sqlite3's statement cache reuses across calls
+SELECT_POSTS = "SELECT id, title, content FROM posts LIMIT ?"
+# Formats one (id, title, content) row from the posts table
+POST_ROW_TEMPLATE = "id: %d | title: %s | content=%s"
+
+# Shared connection opened once by the app lifespan and reused by every tool call
+_DB: Optional[aiosqlite.Connection] = None
+# Serializes execute + commit pairs so concurrent writers don't interleave. A
+# failed write rolls back, so the next commit can't pick up its partial changes.
+_WRITE_LOCK = asyncio.Lock()
 
 
 # Initialize the database
 async def init_db():
-    async with aiosqlite.connect(DB_FILE) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL
-            )
-        """)
-        await db.commit()
+    global _DB
+    _DB = await aiosqlite.connect(DB_FILE)
+    # Already the default; spelled out because POST_ROW_TEMPLATE needs plain tuples
+    _DB.row_factory = None
+    await _DB.execute("PRAGMA journal_mode=WAL")
+    await _DB.execute("PRAGMA synchronous=NORMAL")
+    await _DB.execute("PRAGMA temp_store=MEMORY")
+    await _DB.execute("PRAGMA cache_size=-20000")
+    await _DB.execute("""
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL
+        )
+    """)
+    await _DB.commit()
+
+
+# Close the shared connection
+async def close_db():
+    global _DB
+    if _DB is not None:
+        await _DB.close()
+        _DB = None
+
+
+# Map an optional tool limit to a LIMIT parameter
+def _limit_param(limit: Optional[int]) -> int:
+    if limit is not None and isinstance(limit, int) and limit > 0:
+        return limit
+    return -1
 
 
 # Get blog posts
@@ -38,18 +82,11 @@ async def get_blog_posts(limit: Optional[int] = None) -> str:
     Args:
         limit: int, Optional max number of posts to return.
     """
-    query = "SELECT id, title, content FROM posts "
-    params: list = []
-    if limit is not None and isinstance(limit, int) and limit > 0:
-        query += " LIMIT ?"
-        params.append(limit)
+    # Rows arrive in chunks and are formatted as they come in
+    async with _DB.execute(SELECT_POSTS, (_limit_param(limit),)) as cursor:
+        lines = [POST_ROW_TEMPLATE % row async for row in cursor]
 
-    async with aiosqlite.connect(DB_FILE) as db:
-        cursor = await db.execute(query, params)
-        rows = await cursor.fetchall()
-
-    list_of_rows = [_format_post_row(r) for r in rows]
-    return "\n".join(list_of_rows)
+    return "\n".join(lines)
 
 
 # Add blog post
@@ -61,13 +98,41 @@ async def add_blog_post(title: str, content: str) -> str:
         title: str, The title of the blog post.
         content: str, The content of the blog post.
     """
-    async with aiosqlite.connect(DB_FILE) as db:
-        await db.execute(
-            "INSERT INTO posts (title, content) VALUES (?, ?)",
-            (title, content),
-        )
-        await db.commit()
-        return "Blog post added successfully"
+    async with _WRITE_LOCK:
+        try:
+            await _DB.execute(INSERT_POST, (title, content))
+            await _DB.commit()
+        except BaseException:
+            await _DB.rollback()
+            raise
+    return "Blog post added successfully"
+
+
+class NewBlogPost(BaseModel):
+    title: str
+    content: str
+
+
+# Add several blog posts
+@mcp.tool()
+async def add_blog_posts(posts: list[NewBlogPost]) -> str:
+    """Add several blog posts in one batch.
+
+    Args:
+        posts: list, The blog posts to add, each with a title and content.
+    """
+    if not posts:
+        raise ValueError("posts must contain at least one blog post")
+    async with _WRITE_LOCK:
+        try:
+            await _DB.executemany(INSERT_POST, [(p.title, p.content) for p in posts])
+            await _DB.commit()
+        except BaseException:
+            await _DB.rollback()
+            raise
+    if len(posts) == 1:
+        return "1 blog post added successfully"
+    return f"{len(posts)} blog posts added successfully"
 
 
 # Remove blog post
@@ -78,22 +143,42 @@ async def remove_blog_post(id: int) -> str:
     Args:
         id: int, The id of the blog post to remove.
     """
-    async with aiosqlite.connect(DB_FILE) as db:
-        await db.execute("DELETE FROM posts WHERE id = ?", (id,))
-        await db.commit()
-        return "Blog post removed successfully"
+    async with _WRITE_LOCK:
+        try:
+            await _DB.execute("DELETE FROM posts WHERE id = ?", (id,))
+            await _DB.commit()
+        except BaseException:
+            await _DB.rollback()
+            raise
+    return "Blog post removed successfully"
+
+
+# Open the shared connection for the app's lifetime, around the MCP session manager
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    await init_db()
+    try:
+        async with mcp_app.router.lifespan_context(app):
+            yield
+    finally:
+        await close_db()
 
 
-# Format post row
-def _format_post_row(row: tuple) -> str:
-    id_, title, content = row
-    return f"id: {id_} | title: {title} | content={content}"
+mcp_app = mcp.streamable_http_app()  # Creates MCP server over Streamable HTTP on /mcp
+app = Starlette(routes=[Mount("/", app=mcp_app)], lifespan=lifespan)
 
 
 def main() -> None:
-    asyncio.run(init_db())
-    app = mcp.streamable_http_app()  # Creates MCP server over Streamable HTTP on /mcp
-    uvicorn_run(app, host="127.0.0.1", port=8000, log_level="info")
+    uvicorn_run(
+        app,
+        host="127.0.0.1",
+        port=8000,
+        loop="auto",  # uvloop where installed (not on Windows), else asyncio
+        http="httptools",
+        timeout_keep_alive=75,  # Outlive the client pool so idle connections get reused
+        log_level="info",
+        access_log=False,  # Skip per-request log formatting
+    )
 
 
 if __name__ == "__main__":